@@ -2,60 +2,216 @@ import cv2
 import mediapipe as mp
 import numpy as np
 import pyautogui
+import queue
+import sys
+import threading
 import time
-import math
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+# OpenCV would otherwise fan resize/cvtColor out across every core and fight
+# TFLite's XNNPACK threadpool for CPU time; two threads are plenty for the
+# preprocessing ops while inference keeps the rest.
+cv2.setNumThreads(2)
+cv2.ocl.setUseOpenCL(False)
+
+# pyautogui sleeps 100ms after every call by default, which makes the cursor
+# lag far behind the hand at webcam frame rates.
+pyautogui.PAUSE = 0
+pyautogui.FAILSAFE = False
+
+if sys.platform == "win32":
+    import ctypes
+
+    _set_cursor_pos = ctypes.windll.user32.SetCursorPos
+
+    def move_cursor(x, y):
+        _set_cursor_pos(int(x), int(y))
+else:
+    move_cursor = pyautogui.moveTo
 
 CLICK_DISTANCE = 50
+CLICK_DISTANCE_SQ = CLICK_DISTANCE * CLICK_DISTANCE
 DOUBLE_CLICK_TIMEOUT = 0.3
 THUMBS_UP_TIME = 2.0
 MOUSE_SMOOTHING = 0.2
+DISPLAY_EVERY = 2
 
 mp_hands = mp.solutions.hands
-hands = mp_hands.Hands(max_num_hands=1, min_detection_confidence=0.7)
+# In video mode the solution derives the hand ROI from the previous frame's
+# landmarks and only reruns the heavy palm detector when tracking confidence
+# drops below min_tracking_confidence. A low detection threshold with a high
+# tracking threshold keeps the detector off on most frames.
+# model_complexity=0 selects the lite landmark model, roughly twice as fast
+# as the default full model with accuracy that is ample for cursor control.
+hands = mp_hands.Hands(static_image_mode=False,
+                       max_num_hands=1,
+                       model_complexity=0,
+                       min_detection_confidence=0.5,
+                       min_tracking_confidence=0.8)
+
+THUMB_TIP_I = mp_hands.HandLandmark.THUMB_TIP.value
+THUMB_IP_I = mp_hands.HandLandmark.THUMB_IP.value
+INDEX_TIP_I = mp_hands.HandLandmark.INDEX_FINGER_TIP.value
+INDEX_MCP_I = mp_hands.HandLandmark.INDEX_FINGER_MCP.value
+MIDDLE_TIP_I = mp_hands.HandLandmark.MIDDLE_FINGER_TIP.value
+MIDDLE_MCP_I = mp_hands.HandLandmark.MIDDLE_FINGER_MCP.value
+RING_TIP_I = mp_hands.HandLandmark.RING_FINGER_TIP.value
+RING_MCP_I = mp_hands.HandLandmark.RING_FINGER_MCP.value
+PINKY_TIP_I = mp_hands.HandLandmark.PINKY_TIP.value
+PINKY_MCP_I = mp_hands.HandLandmark.PINKY_MCP.value
+
+THUMBS_UP_IDX = (THUMB_TIP_I, THUMB_IP_I, INDEX_TIP_I, INDEX_MCP_I,
+                 MIDDLE_TIP_I, MIDDLE_MCP_I, RING_TIP_I, RING_MCP_I,
+                 PINKY_TIP_I, PINKY_MCP_I)
+THUMBS_UP_THRESH = np.array([-10, -20, -20, -20, -20], dtype=np.float32)
 
 screen_w, screen_h = pyautogui.size()
 
+def cursor_step(thumb_x, thumb_y, index_x, index_y, last_x, last_y,
+                frame_w, frame_h, screen_w, screen_h, click_dist_sq):
+    """Pure numeric kernel for the per-frame cursor geometry.
+
+    Maps the thumb position (the central [0.1, 0.9] band of the frame) to a
+    clamped screen target, advances the EMA smoother one step and checks the
+    pinch distance, all in one call that Numba compiles to native code when
+    it is installed. Screen geometry and the click threshold come in as
+    arguments because njit(cache=True) would otherwise freeze them into the
+    on-disk compiled code, surviving a monitor or resolution change.
+    """
+    dx = (index_x - thumb_x) * frame_w
+    dy = (index_y - thumb_y) * frame_h
+    pinched = dx * dx + dy * dy < click_dist_sq
+
+    target_x = (thumb_x - 0.1) * (screen_w / 0.8)
+    target_y = (thumb_y - 0.1) * (screen_h / 0.8)
+    target_x = 0.0 if target_x < 0 else (screen_w if target_x > screen_w else target_x)
+    target_y = 0.0 if target_y < 0 else (screen_h if target_y > screen_h else target_y)
+
+    new_x = last_x + MOUSE_SMOOTHING * (target_x - last_x)
+    new_y = last_y + MOUSE_SMOOTHING * (target_y - last_y)
+    return new_x, new_y, pinched
+
+if njit is not None:
+    cursor_step = njit(cache=True)(cursor_step)
+
 last_click_time = 0
 click_count = 0
-last_mouse_x, last_mouse_y = screen_w//2, screen_h//2
+last_mouse = np.array([screen_w / 2, screen_h / 2], dtype=np.float64)
 thumbs_up_active = False
 thumbs_up_start_time = 0
 
-def calculate_distance(p1, p2):
-    return math.hypot(p2[0] - p1[0], p2[1] - p1[1])
+class FrameGrabber(threading.Thread):
+    """Reads frames in the background so the main loop always gets the newest one."""
 
-def is_thumbs_up(hand_landmarks, frame_width, frame_height):
-    def get_y(landmark):
-        return landmark.y * frame_height
+    def __init__(self, cap):
+        super().__init__(daemon=True)
+        self.cap = cap
+        self.lock = threading.Lock()
+        self.frame = None
+        self.running = True
+
+    def run(self):
+        try:
+            while self.running and self.cap.isOpened():
+                # grab() pulls the next frame out of the driver's queue
+                # without decoding it, so stale frames are drained for free;
+                # retrieve() only pays the decode cost when the last frame
+                # was consumed.
+                if not self.cap.grab():
+                    break
+                with self.lock:
+                    pending = self.frame is not None
+                if pending:
+                    continue
+                ret, f = self.cap.retrieve()
+                if ret:
+                    with self.lock:
+                        self.frame = f
+        finally:
+            # Whatever ends this thread (camera missing, read failure), the
+            # main loop keys off running and must not spin forever.
+            self.running = False
+
+def put_latest(q, item):
+    """Drop whatever is queued and put item, keeping the slot at the newest."""
+    try:
+        q.get_nowait()
+    except queue.Empty:
+        pass
+    q.put_nowait(item)
 
-    thumb_tip = hand_landmarks.landmark[mp_hands.HandLandmark.THUMB_TIP]
-    thumb_ip = hand_landmarks.landmark[mp_hands.HandLandmark.THUMB_IP]
-    index_tip = hand_landmarks.landmark[mp_hands.HandLandmark.INDEX_FINGER_TIP]
-    index_mcp = hand_landmarks.landmark[mp_hands.HandLandmark.INDEX_FINGER_MCP]
-    middle_tip = hand_landmarks.landmark[mp_hands.HandLandmark.MIDDLE_FINGER_TIP]
-    middle_mcp = hand_landmarks.landmark[mp_hands.HandLandmark.MIDDLE_FINGER_MCP]
-    ring_tip = hand_landmarks.landmark[mp_hands.HandLandmark.RING_FINGER_TIP]
-    ring_mcp = hand_landmarks.landmark[mp_hands.HandLandmark.RING_FINGER_MCP]
-    pinky_tip = hand_landmarks.landmark[mp_hands.HandLandmark.PINKY_TIP]
-    pinky_mcp = hand_landmarks.landmark[mp_hands.HandLandmark.PINKY_MCP]
+def detect_worker(frames_q, results_q):
+    """Inference stage: preprocess and run MediaPipe, overlapping with render.
 
-    thumb_up = get_y(thumb_tip) < get_y(thumb_ip) - 10
+    Frames are processed unmirrored; the render stage mirrors the landmark
+    coordinates and flips the frame only when it is actually displayed.
+    """
+    rgb_buf = None
+    small = np.empty((240, 320, 3), dtype=np.uint8)
+    frame_idx = 0
+    last_results = None
 
-    index_folded = get_y(index_tip) > get_y(index_mcp) + 20
-    middle_folded = get_y(middle_tip) > get_y(middle_mcp) + 20
-    ring_folded = get_y(ring_tip) > get_y(ring_mcp) + 20
-    pinky_folded = get_y(pinky_tip) > get_y(pinky_mcp) + 20
+    cvt_color = cv2.cvtColor
+    resize = cv2.resize
+    process = hands.process
 
-    return thumb_up and index_folded and middle_folded and ring_folded and pinky_folded
+    while True:
+        frame = frames_q.get()
+        if frame is None:
+            break
+
+        if rgb_buf is None:
+            rgb_buf = np.empty_like(frame)
+
+        # Adjacent frames differ little at webcam rates, so the detector only
+        # runs on every other frame; in between the previous landmarks are
+        # reused and the cursor's EMA smoothing masks the staleness.
+        frame_idx += 1
+        if last_results is None or frame_idx % 2 == 0:
+            cvt_color(frame, cv2.COLOR_BGR2RGB, dst=rgb_buf)
+            # Landmarks are normalized to [0, 1], so inference can run on a
+            # much smaller image while drawing and cursor mapping stay
+            # full-res.
+            resize(rgb_buf, (320, 240), dst=small, interpolation=cv2.INTER_LINEAR)
+            last_results = process(small)
+        put_latest(results_q, (frame, last_results))
+
+def is_thumbs_up(hand_landmarks, frame_width, frame_height):
+    lm = hand_landmarks.landmark
+    ys = np.fromiter((lm[i].y for i in THUMBS_UP_IDX),
+                     dtype=np.float32, count=10) * frame_height
+
+    # tip-vs-joint gaps: thumb tip above its IP, the four finger tips below
+    # their MCPs. Negating the finger gaps folds all five tests into one
+    # elementwise compare against THUMBS_UP_THRESH.
+    diffs = ys[0::2] - ys[1::2]
+    diffs[1:] *= -1
+    return bool((diffs < THUMBS_UP_THRESH).all())
 
 
 def main():
-    global last_click_time, click_count, last_mouse_x, last_mouse_y
+    global last_click_time, click_count, last_mouse
     global thumbs_up_active, thumbs_up_start_time
     
     cap = cv2.VideoCapture(0)
     cap.set(3, 1280)
     cap.set(4, 720)
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+
+    grabber = FrameGrabber(cap)
+    grabber.start()
+
+    # Single-slot queues between the capture/inference/render stages:
+    # put_latest keeps only the newest item so no stage falls behind.
+    frames_q = queue.Queue(maxsize=1)
+    results_q = queue.Queue(maxsize=1)
+    worker = threading.Thread(target=detect_worker,
+                              args=(frames_q, results_q), daemon=True)
+    worker.start()
 
     print(" Virtual Mouse Control ")
     print("Hand gestures:")
@@ -64,25 +220,58 @@ def main():
     print("- Double pinch: Double click")
     print("- Thumbs-up for 2 seconds: Quit program")
 
-    while cap.isOpened():
-        ret, frame = cap.read()
-        if not ret:
-            break
+    move_to = move_cursor
+    click = pyautogui.click
+    double_click = pyautogui.doubleClick
+
+    hint_overlay = None
+    disp = None
+    render_idx = 0
+    # Trigger the one-off JIT compile before frames start flowing.
+    cursor_step(0.5, 0.5, 0.5, 0.5, 0.0, 0.0, 1280, 720,
+                screen_w, screen_h, CLICK_DISTANCE_SQ)
+    # monotonic is immune to wall-clock jumps that would break the click and
+    # thumbs-up hold timers, and slightly cheaper to read than time.time.
+    now = time.monotonic
+    put_text = cv2.putText
+    circle = cv2.circle
+    line = cv2.line
+    blend = cv2.add
+    flip = cv2.flip
+    imshow = cv2.imshow
+    wait_key = cv2.waitKey
+
+    while grabber.running:
+        with grabber.lock:
+            frame = grabber.frame
+            grabber.frame = None
+        if frame is not None:
+            put_latest(frames_q, frame)
+
+        try:
+            frame, results = results_q.get(timeout=0.1)
+        except queue.Empty:
+            continue
 
-        frame = cv2.flip(frame, 1)
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = hands.process(rgb)
         h, w = frame.shape[:2]
-        current_time = time.time()
+        current_time = now()
+        quit_text = None
+        pinch_feedback = None
+        show_markers = False
 
         if results.multi_hand_landmarks:
             for hand_landmarks in results.multi_hand_landmarks:
-                thumb = hand_landmarks.landmark[mp_hands.HandLandmark.THUMB_TIP]
-                index = hand_landmarks.landmark[mp_hands.HandLandmark.INDEX_FINGER_TIP]
-                
-                thumb_pt = (int(thumb.x * w), int(thumb.y * h))
-                index_pt = (int(index.x * w), int(index.y * h))
-                distance = calculate_distance(thumb_pt, index_pt)
+                lm = hand_landmarks.landmark
+                thumb = lm[THUMB_TIP_I]
+                index = lm[INDEX_TIP_I]
+
+                # The camera image is no longer flipped, so mirror the x
+                # coordinates instead to keep the familiar mirror-view
+                # mapping; y and inter-point distances are unaffected.
+                thumb_x = 1.0 - thumb.x
+                index_x = 1.0 - index.x
+                thumb_pt = (int(thumb_x * w), int(thumb.y * h))
+                index_pt = (int(index_x * w), int(index.y * h))
 
                 if is_thumbs_up(hand_landmarks, w, h):
                     if not thumbs_up_active:
@@ -92,24 +281,28 @@ def main():
                         if current_time - thumbs_up_start_time > THUMBS_UP_TIME:
                             quit_time = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
                             print(f"Thumbs-up quit gesture detected at {quit_time}")
+                            grabber.running = False
+                            put_latest(frames_q, None)
+                            # VideoCapture is not thread-safe: wait for the
+                            # grabber to leave grab() before releasing.
+                            grabber.join()
                             cap.release()
                             cv2.destroyAllWindows()
                             return
                     
-                    cv2.putText(frame, f"QUITTING: {int(THUMBS_UP_TIME - (current_time - thumbs_up_start_time))}s", 
-                               (w//2 - 100, 50), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
+                    quit_text = f"QUITTING: {int(THUMBS_UP_TIME - (current_time - thumbs_up_start_time))}s"
                 else:
                     thumbs_up_active = False
                 
                 if not thumbs_up_active:
-                    target_x = np.interp(thumb.x, [0.1, 0.9], [0, screen_w])
-                    target_y = np.interp(thumb.y, [0.1, 0.9], [0, screen_h])
-                    
-                    last_mouse_x = last_mouse_x * (1 - MOUSE_SMOOTHING) + target_x * MOUSE_SMOOTHING
-                    last_mouse_y = last_mouse_y * (1 - MOUSE_SMOOTHING) + target_y * MOUSE_SMOOTHING
-                    pyautogui.moveTo(last_mouse_x, last_mouse_y)
-                    
-                    if distance < CLICK_DISTANCE:
+                    new_x, new_y, pinched = cursor_step(thumb_x, thumb.y, index_x, index.y,
+                                                        last_mouse[0], last_mouse[1], w, h,
+                                                        screen_w, screen_h, CLICK_DISTANCE_SQ)
+                    last_mouse[0] = new_x
+                    last_mouse[1] = new_y
+                    move_to(new_x, new_y)
+
+                    if pinched:
                         time_since_last_click = current_time - last_click_time
                         
                         if time_since_last_click < DOUBLE_CLICK_TIMEOUT:
@@ -123,35 +316,65 @@ def main():
                         feedback_text = "CLICK"
                         
                         if click_count == 2:
-                            pyautogui.doubleClick()
+                            double_click()
                             feedback_color = (0, 255, 0)
                             feedback_text = "DOUBLE CLICK"
                             click_count = 0
                         elif time_since_last_click > 0.3:
-                            pyautogui.click()
+                            click()
                         
-                        cv2.circle(frame, thumb_pt, 30, feedback_color, -1)
-                        cv2.putText(frame, feedback_text, (thumb_pt[0]-70, thumb_pt[1]-40), 
-                                   cv2.FONT_HERSHEY_SIMPLEX, 0.8, feedback_color, 2)
-                
-                    line_color = (0, 165, 255)
-                    cv2.line(frame, thumb_pt, index_pt, line_color, 3)
-                    for pt in [thumb_pt, index_pt]:
-                        cv2.circle(frame, pt, 15, line_color, -1)
-                        cv2.circle(frame, pt, 20, line_color, 2)
-
-        if not thumbs_up_active:
-            cv2.putText(frame, "Move Hand to Control Mouse", (20, 40), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
-            cv2.putText(frame, "Pinch to Click | Double-Pinch to Double-Click", (20, 80), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
-            cv2.putText(frame, "Thumbs-Up for 2s to Quit", (20, 120), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
-        
-        cv2.imshow("Hand Mouse", frame)
-        if cv2.waitKey(5) & 0xFF in (ord('q'), ord('Q')):
-            break
+                        pinch_feedback = (feedback_text, feedback_color)
+
+                    show_markers = True
+
+        # Tracking runs on every result, but pushing 1280x720 frames to the
+        # GUI is memory-bound, so the preview only refreshes every other one.
+        # The mirror flip happens only here, on frames that are shown, and
+        # all overlays are drawn post-flip in mirrored coordinates.
+        render_idx += 1
+        if render_idx % DISPLAY_EVERY == 0:
+            if disp is None:
+                disp = np.empty_like(frame)
+            flip(frame, 1, dst=disp)
+
+            if show_markers:
+                line_color = (0, 165, 255)
+                line(disp, thumb_pt, index_pt, line_color, 3)
+                circle(disp, thumb_pt, 20, line_color, -1)
+                circle(disp, index_pt, 20, line_color, -1)
+                if pinch_feedback is not None:
+                    feedback_text, feedback_color = pinch_feedback
+                    circle(disp, thumb_pt, 30, feedback_color, -1)
+                    put_text(disp, feedback_text, (thumb_pt[0]-70, thumb_pt[1]-40),
+                             cv2.FONT_HERSHEY_SIMPLEX, 0.8, feedback_color, 2)
+
+            if quit_text is not None:
+                put_text(disp, quit_text, (w//2 - 100, 50),
+                         cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
+
+            if not thumbs_up_active:
+                if hint_overlay is None:
+                    # The hint text never changes, so rasterize the glyphs
+                    # once and blit the cached sprite instead of three
+                    # putText calls.
+                    hint_overlay = np.zeros_like(frame)
+                    cv2.putText(hint_overlay, "Move Hand to Control Mouse", (20, 40),
+                               cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+                    cv2.putText(hint_overlay, "Pinch to Click | Double-Pinch to Double-Click", (20, 80),
+                               cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+                    cv2.putText(hint_overlay, "Thumbs-Up for 2s to Quit", (20, 120),
+                               cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+                blend(disp, hint_overlay, dst=disp)
+
+            imshow("Hand Mouse", disp)
+            if wait_key(1) & 0xFF in (ord('q'), ord('Q')):
+                break
 
+    grabber.running = False
+    put_latest(frames_q, None)
+    # VideoCapture is not thread-safe: wait for the grabber to leave grab()
+    # before releasing.
+    grabber.join()
     cap.release()
     cv2.destroyAllWindows()
 